@@ -15,7 +15,9 @@
 The Grover's Search algorithm.
 """
 
+import copy
 import logging
+import math
 import operator
 import numpy as np
 
@@ -44,11 +46,17 @@ class Grover(QuantumAlgorithm):
     `num_iterations` isn't known in advance,
     a multi-round schedule will be followed with incremental trial `num_iterations` values.
     The implementation follows Section 4 of Boyer et al. <https://arxiv.org/abs/quant-ph/9605034>
+    Since the trial `num_iterations` values don't depend on earlier outcomes, the whole
+    schedule is drawn upfront and all of its rounds are executed in a single job, and the
+    outcomes are then checked in order. This saves the per-job overhead, at the cost of
+    always building and executing every round, even when an early one would have succeeded,
+    and of always drawing the full schedule from the random number generator.
     """
 
     PROP_INCREMENTAL = 'incremental'
     PROP_NUM_ITERATIONS = 'num_iterations'
     PROP_MCT_MODE = 'mct_mode'
+    PROP_UNITARY_DIFFUSION = 'unitary_diffusion'
 
     CONFIGURATION = {
         'name': 'Grover',
@@ -77,6 +85,10 @@ class Grover(QuantumAlgorithm):
                         'noancilla',
                     ]
                 },
+                PROP_UNITARY_DIFFUSION: {
+                    'type': 'boolean',
+                    'default': False
+                },
             },
             'additionalProperties': False
         },
@@ -99,7 +111,8 @@ class Grover(QuantumAlgorithm):
     }
 
     def __init__(self, oracle, init_state=None,
-                 incremental=False, num_iterations=1, mct_mode='basic'):
+                 incremental=False, num_iterations=1, mct_mode='basic',
+                 unitary_diffusion=False):
         """
         Constructor.
 
@@ -109,6 +122,11 @@ class Grover(QuantumAlgorithm):
             incremental (bool): boolean flag for whether to use incremental search mode or not
             num_iterations (int): the number of iterations to use for amplitude amplification
             mct_mode (str): mct mode
+            unitary_diffusion (bool): boolean flag for whether to implement the reflection of
+                the diffusion operator as a single unitary gate when running on a simulator
+                backend, instead of decomposing it into elementary gates around an mct.
+                The gate is a dense 2^n x 2^n matrix over the n variable qubits, so it is only
+                meant for small searches; a warning is logged beyond 10 variable qubits
         Raises:
             AquaError: evaluate_classically() missing from the input oracle
         """
@@ -122,14 +140,14 @@ class Grover(QuantumAlgorithm):
 
         self._oracle = oracle
         self._mct_mode = mct_mode
+        self._unitary_diffusion = unitary_diffusion
         self._init_state = \
             init_state if init_state else Custom(len(oracle.variable_register), state='uniform')
         self._init_state_circuit = \
             self._init_state.construct_circuit(mode='circuit', register=oracle.variable_register)
         self._init_state_circuit_inverse = self._init_state_circuit.inverse()
 
-        self._diffusion_circuit = self._construct_diffusion_circuit()
-        self._max_num_iterations = np.ceil(2 ** (len(oracle.variable_register) / 2))
+        self._max_num_iterations = Grover._ceil_sqrt(2 ** len(oracle.variable_register))
         self._incremental = incremental
         self._num_iterations = num_iterations if not incremental else 1
         self.validate(locals())
@@ -139,14 +157,71 @@ class Grover(QuantumAlgorithm):
             if num_iterations > self._max_num_iterations:
                 logger.warning('The specified value %s for "num_iterations" '
                                'might be too high.', num_iterations)
+        if unitary_diffusion and len(oracle.variable_register) > 10:
+            logger.warning('The unitary diffusion on %s variable qubits is a dense matrix '
+                           'with %s entries.', len(oracle.variable_register),
+                           4 ** len(oracle.variable_register))
         self._ret = {}
+        self._classical_evaluations = {}
+
+        # the circuit components only depend on the oracle and the initial state,
+        # so they are built once here rather than on every run
+        self._diffusion_circuit = None
+        self._diffusion_is_unitary = False
         self._qc_aa_iteration = None
+        self._qc_prefix = None
         self._qc_amplitude_amplification = None
         self._qc_measurement = None
+        self._construct_prefix_circuit()
+        self._construct_measurement_circuit()
+        # with unitary diffusion the iteration depends on the backend, known only when run
+        if not unitary_diffusion:
+            self._construct_amplitude_amplification_iteration()
+
+    @staticmethod
+    def _ceil_sqrt(num):
+        """ integer ceiling of the square root of the non-negative integer `num` """
+        root = int(math.sqrt(num))
+        while root * root > num:
+            root -= 1
+        while root * root < num:
+            root += 1
+        return root
+
+    def _is_uniform_init_state(self):
+        """ check whether the initial state circuit is a single h on every variable qubit """
+        variable_register = self._oracle.variable_register
+        data = self._init_state_circuit.data
+        if len(data) != len(variable_register):
+            return False
+        for (inst, qargs, _), qubit in zip(data, variable_register):
+            if inst.name != 'u2' or qargs != [qubit] or \
+                    not np.allclose([float(p) for p in inst.params], [0, pi]):
+                return False
+        return True
+
+    def _use_unitary_diffusion(self):
+        return self._unitary_diffusion and \
+            self._quantum_instance is not None and self._quantum_instance.is_simulator
 
     def _construct_diffusion_circuit(self):
-        qc = QuantumCircuit(self._oracle.variable_register)
-        num_variable_qubits = len(self._oracle.variable_register)
+        variable_register = self._oracle.variable_register
+        ancillary_register = self._oracle.ancillary_register
+        num_variable_qubits = len(variable_register)
+        qc = QuantumCircuit(variable_register)
+        self._diffusion_is_unitary = self._use_unitary_diffusion()
+        if self._diffusion_is_unitary:
+            # the u3/u2/mct sandwich below amounts to the reflection I - 2|0><0|,
+            # which simulators can apply directly as a single diagonal unitary
+            reflection = np.identity(2 ** num_variable_qubits)
+            reflection[0, 0] = -1
+            qc.barrier(variable_register)
+            qc += self._init_state_circuit_inverse
+            qc.unitary(reflection, variable_register, label='reflection')
+            qc += self._init_state_circuit
+            qc.barrier(variable_register)
+            return qc
+
         num_ancillae_needed = 0
         if self._mct_mode == 'basic' or self._mct_mode == 'basic-dirty-ancilla':
             num_ancillae_needed = max(0, num_variable_qubits - 2)
@@ -154,34 +229,41 @@ class Grover(QuantumAlgorithm):
             num_ancillae_needed = 1
 
         # check oracle's existing ancilla and add more if necessary
-        num_oracle_ancillae = \
-            len(self._oracle.ancillary_register) if self._oracle.ancillary_register else 0
+        num_oracle_ancillae = len(ancillary_register) if ancillary_register else 0
         num_additional_ancillae = num_ancillae_needed - num_oracle_ancillae
         if num_additional_ancillae > 0:
             extra_ancillae = QuantumRegister(num_additional_ancillae, name='a_e')
             qc.add_register(extra_ancillae)
             ancilla = list(extra_ancillae)
             if num_oracle_ancillae > 0:
-                ancilla += list(self._oracle.ancillary_register)
+                ancilla += list(ancillary_register)
+        else:
+            ancilla = ancillary_register
+
+        if ancillary_register:
+            qc.add_register(ancillary_register)
+        control_qubits = variable_register[0:num_variable_qubits - 1]
+        target_qubit = variable_register[num_variable_qubits - 1]
+        qc.barrier(variable_register)
+        if self._is_uniform_init_state():
+            # for the uniform superposition the surrounding h's fold into the x's:
+            # x.h = u2(0, 0) and h.x = u2(pi, pi) on the controls, h.x.h = z on the target
+            for qubit in control_qubits:
+                qc.u2(0, 0, qubit)
+            qc.u1(pi, target_qubit)
+            qc.mct(control_qubits, target_qubit, ancilla, mode=self._mct_mode)
+            qc.u1(pi, target_qubit)
+            for qubit in control_qubits:
+                qc.u2(pi, pi, qubit)
         else:
-            ancilla = self._oracle.ancillary_register
-
-        if self._oracle.ancillary_register:
-            qc.add_register(self._oracle.ancillary_register)
-        qc.barrier(self._oracle.variable_register)
-        qc += self._init_state_circuit_inverse
-        qc.u3(pi, 0, pi, self._oracle.variable_register)
-        qc.u2(0, pi, self._oracle.variable_register[num_variable_qubits - 1])
-        qc.mct(
-            self._oracle.variable_register[0:num_variable_qubits - 1],
-            self._oracle.variable_register[num_variable_qubits - 1],
-            ancilla,
-            mode=self._mct_mode
-        )
-        qc.u2(0, pi, self._oracle.variable_register[num_variable_qubits - 1])
-        qc.u3(pi, 0, pi, self._oracle.variable_register)
-        qc += self._init_state_circuit
-        qc.barrier(self._oracle.variable_register)
+            qc += self._init_state_circuit_inverse
+            qc.u3(pi, 0, pi, variable_register)
+            qc.u2(0, pi, target_qubit)
+            qc.mct(control_qubits, target_qubit, ancilla, mode=self._mct_mode)
+            qc.u2(0, pi, target_qubit)
+            qc.u3(pi, 0, pi, variable_register)
+            qc += self._init_state_circuit
+        qc.barrier(variable_register)
         return qc
 
     @classmethod
@@ -203,6 +285,7 @@ class Grover(QuantumAlgorithm):
         incremental = grover_params.get(Grover.PROP_INCREMENTAL)
         num_iterations = grover_params.get(Grover.PROP_NUM_ITERATIONS)
         mct_mode = grover_params.get(Grover.PROP_MCT_MODE)
+        unitary_diffusion = grover_params.get(Grover.PROP_UNITARY_DIFFUSION)
 
         oracle_params = params.get(Pluggable.SECTION_KEY_ORACLE)
         oracle = get_pluggable_class(PluggableType.ORACLE,
@@ -215,21 +298,112 @@ class Grover(QuantumAlgorithm):
                                          init_state_params['name']).init_params(params)
 
         return cls(oracle, init_state=init_state,
-                   incremental=incremental, num_iterations=num_iterations, mct_mode=mct_mode)
+                   incremental=incremental, num_iterations=num_iterations, mct_mode=mct_mode,
+                   unitary_diffusion=unitary_diffusion)
 
     @property
     def qc_amplitude_amplification_iteration(self):
         """ qc amplitude amplification iteration """
+        return self._construct_amplitude_amplification_iteration()
+
+    def _construct_amplitude_amplification_iteration(self):
         if self._qc_aa_iteration is None:
+            if self._diffusion_circuit is None:
+                self._diffusion_circuit = self._construct_diffusion_circuit()
             self._qc_aa_iteration = QuantumCircuit()
             self._qc_aa_iteration += self._oracle.circuit
             self._qc_aa_iteration += self._diffusion_circuit
         return self._qc_aa_iteration
 
-    def _run_with_existing_iterations(self):
+    def _construct_amplitude_amplification(self, num_iterations, qc_iteration=None):
+        """
+        Build the amplitude amplification circuit in a single pass, appending the
+        instructions of one grover iteration `num_iterations` times onto one circuit
+        rather than repeatedly concatenating whole circuits.
+
+        Args:
+            num_iterations (int): the number of amplitude amplification iterations
+            qc_iteration (QuantumCircuit): the single iteration circuit to repeat,
+                defaults to `qc_amplitude_amplification_iteration`
+
+        Returns:
+            QuantumCircuit: the amplitude amplification circuit
+        """
+        if qc_iteration is None:
+            qc_iteration = self.qc_amplitude_amplification_iteration
+        qc = QuantumCircuit(*qc_iteration.qregs, *qc_iteration.cregs)
+        for _ in range(num_iterations):
+            for inst, qargs, cargs in qc_iteration.data:
+                qc._append(inst, qargs, cargs)
+        return qc
+
+    def _can_transpile_components(self):
+        """
+        The circuit components can be transpiled separately and spliced together
+        only if the transpiler will not map them onto a physical qubit layout, and
+        if the grover iteration has no resets, since transpiling it on its own assumes
+        it starts from the zero state and would drop any leading ones.
+        """
+        qc_iteration = self.qc_amplitude_amplification_iteration
+        return self._quantum_instance.backend_config.get('coupling_map') is None and \
+            self._quantum_instance.compile_config.get('initial_layout') is None and \
+            self._quantum_instance.compile_config.get('pass_manager') is None and \
+            all(inst.name != 'reset' for inst, _, _ in qc_iteration.data)
+
+    def _construct_experiments(self, iterations):
+        """
+        Construct the circuits to execute, one for each round of the schedule.
+
+        On statevector backends a round's outcome is deterministic, so rounds with the same
+        number of iterations share one circuit; otherwise every round is sampled separately.
+
+        Args:
+            iterations (list[int]): the numbers of amplitude amplification iterations per round
+
+        Returns:
+            tuple(list, bool): the circuits of the rounds, and whether
+                they have already been transpiled
+        """
+        measurement = not self._quantum_instance.is_statevector
+        shared_circuits = {}
+
+        def _construct_experiment(num_iterations, construct):
+            if not measurement:
+                if num_iterations not in shared_circuits:
+                    shared_circuits[num_iterations] = construct(num_iterations)
+                return shared_circuits[num_iterations]
+            return construct(num_iterations)
+
+        if not self._can_transpile_components():
+            def _construct_logical(num_iterations):
+                self._qc_amplitude_amplification = \
+                    self._construct_amplitude_amplification(num_iterations)
+                return self.construct_circuit(measurement=measurement)
+
+            return [_construct_experiment(num_iterations, _construct_logical)
+                    for num_iterations in iterations], False
+
+        # the grover iteration is transpiled once and its lowered instructions are
+        # repeated, so transpilation cost does not grow with the number of iterations
+        components = [self._construct_prefix_circuit(), self.qc_amplitude_amplification_iteration]
+        if measurement:
+            components.append(self._construct_measurement_circuit())
+        components = self._quantum_instance.transpile(components)
+
+        def _construct_spliced(num_iterations):
+            qc = QuantumCircuit()
+            qc += components[0]
+            qc += self._construct_amplitude_amplification(num_iterations, components[1])
+            if measurement:
+                qc += components[2]
+            return qc
+
+        return [_construct_experiment(num_iterations, _construct_spliced)
+                for num_iterations in iterations], True
+
+    def _evaluate_result(self, qc, result):
+        num_variable_qubits = len(self._oracle.variable_register)
         if self._quantum_instance.is_statevector:
-            qc = self.construct_circuit(measurement=False)
-            result = self._quantum_instance.execute(qc)
             complete_state_vec = result.get_statevector(qc)
             variable_register_density_matrix = get_subsystem_density_matrix(
                 complete_state_vec,
@@ -243,17 +417,24 @@ class Grover(QuantumAlgorithm):
             )
             max_amplitude_idx = \
                 np.where(variable_register_density_matrix_diag == max_amplitude)[0][0]
-            top_measurement = np.binary_repr(max_amplitude_idx, len(self._oracle.variable_register))
+            top_measurement = np.binary_repr(max_amplitude_idx, num_variable_qubits)
         else:
-            qc = self.construct_circuit(measurement=True)
-            measurement = self._quantum_instance.execute(qc).get_counts(qc)
+            measurement = result.get_counts(qc)
             self._ret['measurement'] = measurement
             top_measurement = max(measurement.items(), key=operator.itemgetter(1))[0]
 
         self._ret['top_measurement'] = top_measurement
-        oracle_evaluation, assignment = self._oracle.evaluate_classically(top_measurement)
+        oracle_evaluation, assignment = self._evaluate_classically(top_measurement)
         return assignment, oracle_evaluation
 
+    def _evaluate_classically(self, measurement):
+        """ evaluate the oracle classically, reusing earlier results for repeated measurements """
+        if measurement not in self._classical_evaluations:
+            self._classical_evaluations[measurement] = \
+                self._oracle.evaluate_classically(measurement)
+        # hand out copies, so that changes to a returned result cannot corrupt the cache
+        return copy.deepcopy(self._classical_evaluations[measurement])
+
     def construct_circuit(self, measurement=False):
         """
         Construct the quantum circuit
@@ -266,44 +447,67 @@ class Grover(QuantumAlgorithm):
             QuantumCircuit: the QuantumCircuit object for the constructed circuit
         """
         if self._qc_amplitude_amplification is None:
-            self._qc_amplitude_amplification = \
-                QuantumCircuit() + self.qc_amplitude_amplification_iteration
-        qc = QuantumCircuit(self._oracle.variable_register, self._oracle.output_register)
-        qc.u3(pi, 0, pi, self._oracle.output_register)  # x
-        qc.u2(0, pi, self._oracle.output_register)  # h
-        qc += self._init_state_circuit
+            self._qc_amplitude_amplification = self._construct_amplitude_amplification(1)
+        qc = QuantumCircuit()
+        qc += self._construct_prefix_circuit()
         qc += self._qc_amplitude_amplification
 
         if measurement:
-            measurement_cr = ClassicalRegister(len(self._oracle.variable_register), name='m')
-            qc.add_register(measurement_cr)
-            qc.measure(self._oracle.variable_register, measurement_cr)
+            qc += self._construct_measurement_circuit()
 
         self._ret['circuit'] = qc
         return qc
 
+    def _construct_prefix_circuit(self):
+        if self._qc_prefix is None:
+            self._qc_prefix = \
+                QuantumCircuit(self._oracle.variable_register, self._oracle.output_register)
+            self._qc_prefix.u3(pi, 0, pi, self._oracle.output_register)  # x
+            self._qc_prefix.u2(0, pi, self._oracle.output_register)  # h
+            self._qc_prefix += self._init_state_circuit
+        return self._qc_prefix
+
+    def _construct_measurement_circuit(self):
+        if self._qc_measurement is None:
+            measurement_cr = ClassicalRegister(len(self._oracle.variable_register), name='m')
+            self._qc_measurement = QuantumCircuit(self._oracle.variable_register, measurement_cr)
+            self._qc_measurement.measure(self._oracle.variable_register, measurement_cr)
+        return self._qc_measurement
+
     def _run(self):
+        if self._use_unitary_diffusion() != self._diffusion_is_unitary:
+            # the diffusion circuit depends on whether the backend is a simulator
+            self._diffusion_circuit = None
+            self._qc_aa_iteration = None
         if self._incremental:
+            # the trial iteration counts of the schedule do not depend on the outcomes,
+            # so all rounds are drawn upfront and submitted together in a single execution
             current_max_num_iterations, lam = 1, 6 / 5
-
-            def _try_current_max_num_iterations():
-                target_num_iterations = self.random.randint(current_max_num_iterations) + 1
-                self._qc_amplitude_amplification = QuantumCircuit()
-                for _ in range(target_num_iterations):
-                    self._qc_amplitude_amplification += self.qc_amplitude_amplification_iteration
-                return self._run_with_existing_iterations()
-
+            target_num_iterations = []
             while current_max_num_iterations < self._max_num_iterations:
-                assignment, oracle_evaluation = _try_current_max_num_iterations()
-                if oracle_evaluation:
-                    break
+                target_num_iterations.append(self.random.randint(current_max_num_iterations) + 1)
                 current_max_num_iterations = \
                     min(lam * current_max_num_iterations, self._max_num_iterations)
         else:
-            self._qc_amplitude_amplification = QuantumCircuit()
-            for _ in range(self._num_iterations):
-                self._qc_amplitude_amplification += self.qc_amplitude_amplification_iteration
-            assignment, oracle_evaluation = self._run_with_existing_iterations()
+            target_num_iterations = [self._num_iterations]
+
+        circuits, had_transpiled = self._construct_experiments(target_num_iterations)
+        distinct_circuits = []
+        for qc in circuits:
+            if not any(qc is distinct_qc for distinct_qc in distinct_circuits):
+                distinct_circuits.append(qc)
+        result = self._quantum_instance.execute(distinct_circuits, had_transpiled=had_transpiled)
+
+        for num_iterations, qc in zip(target_num_iterations, circuits):
+            reported_num_iterations = num_iterations
+            assignment, oracle_evaluation = self._evaluate_result(qc, result)
+            if oracle_evaluation:
+                break
+
+        # record the logical circuit of the reported round, whether or not it was spliced
+        self._qc_amplitude_amplification = \
+            self._construct_amplitude_amplification(reported_num_iterations)
+        self.construct_circuit(measurement=not self._quantum_instance.is_statevector)
 
         self._ret['result'] = assignment
         self._ret['oracle_evaluation'] = oracle_evaluation
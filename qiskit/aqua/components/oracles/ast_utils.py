@@ -17,6 +17,8 @@
 from sympy.core.symbol import Symbol
 from sympy.logic.boolalg import And, Or, Not, Xor
 
+from qiskit.aqua import AquaError
+
 
 def get_ast(var_to_lit_map, clause):
     """ get ast """
@@ -31,3 +33,24 @@ def get_ast(var_to_lit_map, clause):
         return (str(type(clause)).lower(), *[get_ast(var_to_lit_map, v) for v in clause.args])
 
     return None
+
+
+def evaluate_ast(ast, values):
+    """
+    evaluate ast classically, with `values[i]` being the truth value of the variable
+    of literal `i + 1`, short-circuiting and/or as soon as the result is determined
+    """
+    op = ast[0]
+    if op == 'const':
+        return bool(ast[1])
+    elif op == 'lit':
+        value = values[abs(ast[1]) - 1]
+        return value if ast[1] > 0 else not value
+    elif op == 'and':
+        return all(evaluate_ast(v, values) for v in ast[1:])
+    elif op == 'or':
+        return any(evaluate_ast(v, values) for v in ast[1:])
+    elif op == 'xor':
+        return sum(evaluate_ast(v, values) for v in ast[1:]) % 2 == 1
+
+    raise AquaError('Unexpected ast operation {}.'.format(op))
@@ -26,7 +26,7 @@ from qiskit import QuantumCircuit, QuantumRegister
 from qiskit.aqua import AquaError
 from qiskit.aqua.circuits import CNF, DNF
 from .oracle import Oracle
-from .ast_utils import get_ast
+from .ast_utils import get_ast, evaluate_ast
 
 logger = logging.getLogger(__name__)
 
@@ -143,6 +143,7 @@ class LogicalExpressionOracle(Oracle):
             ast = 'const', 0
         else:
             ast = get_ast(self._var_to_lit, cnf)
+        self._ast = ast
 
         if ast[0] == 'or':
             self._nf = DNF(ast, num_vars=self._num_vars)
@@ -183,7 +184,5 @@ class LogicalExpressionOracle(Oracle):
         """ evaluate classically """
         assignment = [(var + 1) * (int(tf) * 2 - 1) for tf, var in zip(measurement[::-1],
                                                                        range(len(measurement)))]
-        assignment_dict = dict()
-        for v in assignment:
-            assignment_dict[self._lit_to_var[abs(v)]] = bool(v > 0)
-        return self._expr.subs(assignment_dict), assignment
+        # evaluate the precomputed normal form directly instead of substituting into sympy
+        return evaluate_ast(self._ast, [v > 0 for v in assignment]), assignment
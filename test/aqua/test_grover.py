@@ -15,13 +15,16 @@
 """ test Grover """
 
 import unittest
+from unittest.mock import patch, PropertyMock
 import itertools
 from test.aqua.common import QiskitAquaTestCase
+import numpy as np
 from parameterized import parameterized
-from qiskit import BasicAer
-from qiskit.aqua import QuantumInstance
+from qiskit import BasicAer, QuantumCircuit, QuantumRegister
+from qiskit.aqua import QuantumInstance, aqua_globals
 from qiskit.aqua.algorithms import Grover
 from qiskit.aqua.components.oracles import LogicalExpressionOracle as LEO, TruthTableOracle as TTO
+from qiskit.aqua.components.oracles import CustomCircuitOracle
 
 
 TESTS = [
@@ -42,6 +45,10 @@ SIMULATORS = ['statevector_simulator', 'qasm_simulator']
 OPTIMIZATIONS = [True, False]
 
 
+def _instruction_names(circuit):
+    return [inst.name for inst, _, _ in circuit.data]
+
+
 class TestGrover(QiskitAquaTestCase):
     """ Grover test """
     @parameterized.expand(
@@ -67,6 +74,115 @@ class TestGrover(QiskitAquaTestCase):
             self.assertEqual(groundtruth, [])
             self.log.debug('Nothing found.')
 
+    @parameterized.expand([
+        ['1' * 8 + '0' * 8],
+        ['1' * 32 + '0' * 32],
+    ])
+    def test_grover_half_solutions(self, input_test):
+        """ grover with half of the assignments being solutions test """
+        # every round is close to a fair coin flip here, so the search relies on the
+        # rounds of the incremental schedule being sampled independently. BasicAer reuses
+        # a given seed_simulator for every experiment of a job, which would make rounds with
+        # the same number of iterations identical, so the per-experiment seeds are instead
+        # made reproducible through numpy's global random state that BasicAer draws them from
+        np.random.seed(50)
+        aqua_globals.random_seed = 50
+        grover = Grover(TTO(input_test), incremental=True)
+        quantum_instance = QuantumInstance(BasicAer.get_backend('qasm_simulator'), shots=1000,
+                                           seed_transpiler=50)
+
+        ret = grover.run(quantum_instance)
+
+        self.assertTrue(ret['oracle_evaluation'])
+        self.assertEqual(ret['top_measurement'][0], '0')
+
+    @parameterized.expand(
+        [x[0] + list(x[1:]) for x in list(itertools.product(TESTS, SIMULATORS))]
+    )
+    def test_grover_unitary_diffusion(self, input_test, sol, oracle_cls, simulator):
+        """ grover with unitary diffusion test """
+        groundtruth = sol
+        oracle = oracle_cls(input_test)
+        grover = Grover(oracle, incremental=True, unitary_diffusion=True)
+        backend = BasicAer.get_backend(simulator)
+        quantum_instance = QuantumInstance(backend, shots=1000)
+
+        ret = grover.run(quantum_instance)
+
+        self.assertIn('unitary', _instruction_names(grover.qc_amplitude_amplification_iteration))
+        if ret['oracle_evaluation']:
+            self.assertIn(ret['top_measurement'], groundtruth)
+        else:
+            self.assertEqual(groundtruth, [])
+
+    def test_grover_unitary_diffusion_rebuild(self):
+        """ grover rebuilding the diffusion when unitary diffusion no longer applies test """
+        grover = Grover(LEO('a & b & c'), unitary_diffusion=True)
+        self.assertNotIn('unitary',
+                         _instruction_names(grover.qc_amplitude_amplification_iteration))
+        quantum_instance = QuantumInstance(BasicAer.get_backend('qasm_simulator'), shots=1000)
+
+        grover.run(quantum_instance)
+        self.assertIn('unitary', _instruction_names(grover.qc_amplitude_amplification_iteration))
+
+        # the same instance on a non-simulator backend falls back to the mct decomposition
+        with patch.object(QuantumInstance, 'is_simulator', new_callable=PropertyMock,
+                          return_value=False):
+            ret = grover.run(quantum_instance)
+        self.assertNotIn('unitary',
+                         _instruction_names(grover.qc_amplitude_amplification_iteration))
+        self.assertEqual(ret['top_measurement'], '111')
+
+    def test_grover_with_coupling_map(self):
+        """ grover transpiling the full circuits onto a coupling map test """
+        grover = Grover(LEO('a & b & c'))
+        num_qubits = grover.construct_circuit(measurement=False).width()
+        coupling_map = [[i, i + 1] for i in range(num_qubits - 1)] + \
+            [[i + 1, i] for i in range(num_qubits - 1)]
+        quantum_instance = QuantumInstance(BasicAer.get_backend('qasm_simulator'), shots=1000,
+                                           coupling_map=coupling_map,
+                                           seed_simulator=50, seed_transpiler=50)
+
+        ret = grover.run(quantum_instance)
+
+        self.assertTrue(ret['oracle_evaluation'])
+        self.assertEqual(ret['top_measurement'], '111')
+
+    def test_grover_with_reset_in_oracle(self):
+        """ grover with an oracle circuit starting with a reset test """
+        q_v = QuantumRegister(2, name='v')
+        q_o = QuantumRegister(1, name='o')
+        q_a = QuantumRegister(1, name='a')
+        circuit = QuantumCircuit(q_v, q_o, q_a)
+        circuit.reset(q_a[0])
+        circuit.ccx(q_v[0], q_v[1], q_a[0])
+        circuit.cx(q_a[0], q_o[0])
+        circuit.ccx(q_v[0], q_v[1], q_a[0])
+        oracle = CustomCircuitOracle(variable_register=q_v, output_register=q_o,
+                                     ancillary_register=q_a, circuit=circuit,
+                                     evaluate_classically_callback=lambda m: (m == '11', [1, 2]))
+        grover = Grover(oracle)
+        quantum_instance = QuantumInstance(BasicAer.get_backend('qasm_simulator'), shots=1000,
+                                           seed_simulator=50, seed_transpiler=50)
+
+        ret = grover.run(quantum_instance)
+
+        self.assertTrue(ret['oracle_evaluation'])
+        self.assertEqual(ret['top_measurement'], '11')
+        self.assertEqual(ret['result'], [1, 2])
+
+    def test_grover_result_mutation(self):
+        """ grover rerun after mutating an earlier result test """
+        grover = Grover(LEO('a & b'))
+        quantum_instance = QuantumInstance(BasicAer.get_backend('statevector_simulator'))
+
+        ret = grover.run(quantum_instance)
+        self.assertEqual(ret['result'], [1, 2])
+        ret['result'].append(3)
+
+        ret = grover.run(quantum_instance)
+        self.assertEqual(ret['result'], [1, 2])
+
 
 if __name__ == '__main__':
     unittest.main()
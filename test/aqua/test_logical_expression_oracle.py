@@ -87,6 +87,17 @@ class TestLogicalExpressionOracle(QiskitAquaTestCase):
             else:
                 self.assertEqual(counts['0'], num_shots)
 
+    @parameterized.expand(
+        [x[0] + list(x[1:]) for x in list(itertools.product(DIMAC_TESTS, OPTIMIZATIONS))]
+    )
+    def test_evaluate_classically(self, dimacs_str, sols, optimization):
+        """ Logic Expr oracle classical evaluation test """
+        leo = LogicalExpressionOracle(dimacs_str, optimization=optimization)
+        for assignment in itertools.product([True, False], repeat=len(leo.variable_register)):
+            measurement = ''.join('1' if t_f else '0' for t_f in reversed(assignment))
+            evaluation, _ = leo.evaluate_classically(measurement)
+            self.assertEqual(evaluation, assignment in sols)
+
 
 if __name__ == '__main__':
     unittest.main()
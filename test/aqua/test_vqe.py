@@ -33,11 +33,10 @@ from qiskit.aqua.algorithms import VQE
 
 class TestVQE(QiskitAquaTestCase):
     """ Test VQE """
-    def setUp(self):
-        super().setUp()
-        # np.random.seed(50)
-        self.seed = 50
-        aqua_globals.random_seed = self.seed
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.seed = 50
         pauli_dict = {
             'paulis': [{"coeff": {"imag": 0.0, "real": -1.052373245772859}, "label": "II"},
                        {"coeff": {"imag": 0.0, "real": 0.39793742484318045}, "label": "IZ"},
@@ -47,7 +46,12 @@ class TestVQE(QiskitAquaTestCase):
                        ]
         }
         qubit_op = WeightedPauliOperator.from_dict(pauli_dict)
-        self.algo_input = EnergyInput(qubit_op)
+        cls.algo_input = EnergyInput(qubit_op)
+
+    def setUp(self):
+        super().setUp()
+        # np.random.seed(50)
+        aqua_globals.random_seed = self.seed
 
     def test_vqe_via_run_algorithm(self):
         """ VQE Via Run Algorithm test """